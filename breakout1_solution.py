@@ -12,9 +12,13 @@ Date: Oct 6, 2025
 import json
 import csv
 import os
+import sys
+import time
+import fnmatch
 import zipfile
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
 
 def unzip_aircraft_data(zip_path: str = "aircraft.zip", extract_to: str = "aircraft_data") -> str:
@@ -55,26 +59,155 @@ def unzip_aircraft_data(zip_path: str = "aircraft.zip", extract_to: str = "aircr
         raise
 
 
-def load_json_file(file_path: str) -> Optional[Dict]:
+class ProgressReporter:
     """
-    Load and parse a single JSON file.
+    Throttled console progress reporter for long-running file processing.
+    
+    Instead of printing a line per file, prints at most one status line per
+    interval with the processing rate and an ETA, and collects errors into a
+    summary printed at the end.
+    
+    Attributes:
+        total: Total number of items expected
+        interval: Minimum number of seconds between status updates
+        processed: Number of items processed so far
+        errors: Count of errors by reason
+        error_examples: First few file names seen for each error reason
+    """
+    
+    def __init__(self, total: int, interval: float = 1.0, max_examples: int = 3):
+        """
+        Initialize the reporter.
+        
+        Args:
+            total: Total number of items expected
+            interval: Minimum number of seconds between status updates
+            max_examples: Number of example file names kept per error reason
+        """
+        self.total = total
+        self.interval = interval
+        self.max_examples = max_examples
+        self.processed = 0
+        self.errors: Counter = Counter()
+        self.error_examples: Dict[str, List[str]] = {}
+        self.start_time = time.monotonic()
+        self.last_report = self.start_time
+    
+    def advance(self, count: int = 1) -> None:
+        """
+        Record processed items and print a status line if the interval elapsed.
+        
+        Args:
+            count: Number of items processed since the last call
+        """
+        self.processed += count
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self._print_status(now)
+    
+    def error(self, reason: str, filename: str) -> None:
+        """
+        Record a failed item.
+        
+        Args:
+            reason: Short description of the failure, used to group errors
+            filename: Name of the file that failed
+        """
+        self.errors[reason] += 1
+        examples = self.error_examples.setdefault(reason, [])
+        if len(examples) < self.max_examples:
+            examples.append(filename)
+    
+    def finish(self) -> None:
+        """Print the final status line and the error summary."""
+        self._print_status(time.monotonic())
+        sys.stdout.write("\n")
+        self.print_error_summary()
+    
+    def print_error_summary(self) -> None:
+        """Print the recorded errors grouped by reason, most frequent first."""
+        for reason, count in self.errors.most_common():
+            examples = ", ".join(self.error_examples[reason])
+            print(f"  ✗ {count} skipped: {reason} (e.g. {examples})")
+    
+    def _print_status(self, now: float) -> None:
+        """Overwrite the current console line with rate and ETA."""
+        elapsed = max(now - self.start_time, 1e-9)
+        rate = self.processed / elapsed
+        remaining = self.total - self.processed
+        eta = remaining / rate if rate > 0 else 0.0
+        sys.stdout.write(
+            f"\r  {self.processed}/{self.total} files "
+            f"({rate:,.0f} files/s, ETA {eta:,.1f}s, {sum(self.errors.values())} errors)"
+        )
+        sys.stdout.flush()
+
+
+def scan_json_files(data_dir: str, pattern: str = "*.json", recursive: bool = False,
+                    min_size: int = 0, max_size: Optional[int] = None,
+                    on_error: Optional[Callable[[str, OSError], None]] = None) -> Iterator[str]:
+    """
+    Yield paths of files in a directory matching a glob pattern and size range.
+    
+    Uses os.scandir so file type checks come from the directory entries
+    rather than extra stat calls; sizes are only looked up when a size
+    filter is set. Only regular files (or symlinks to them) are yielded, and
+    symlinked directories are not followed.
+    
+    Args:
+        data_dir: Directory to scan
+        pattern: Glob pattern file names must match
+        recursive: Whether to descend into subdirectories
+        min_size: Minimum file size in bytes
+        max_size: Maximum file size in bytes, or None for no limit
+        on_error: Called with the path and exception for each directory that
+            can't be read; if None, the exception is raised
+        
+    Yields:
+        Path to each matching file
+    """
+    check_size = min_size > 0 or max_size is not None
+    pending = [data_dir]
+    
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                        continue
+                    if not entry.is_file() or not fnmatch.fnmatch(entry.name, pattern):
+                        continue
+                    if check_size:
+                        size = entry.stat().st_size
+                        if size < min_size or (max_size is not None and size > max_size):
+                            continue
+                    yield entry.path
+        except OSError as e:
+            if on_error is None:
+                raise
+            on_error(directory, e)
+
+
+def read_json_file(file_path: str) -> Dict:
+    """
+    Read and parse a single JSON file in one bulk binary read.
     
     Args:
         file_path: Path to the JSON file
         
     Returns:
-        Dictionary containing JSON data, or None if error occurs
+        Dictionary containing JSON data
+        
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If the file isn't valid JSON (json.JSONDecodeError) or UTF-8
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data
-    except json.JSONDecodeError as e:
-        print(f"✗ Warning: Invalid JSON in {file_path}: {e}")
-        return None
-    except Exception as e:
-        print(f"✗ Warning: Could not read {file_path}: {e}")
-        return None
+    with open(file_path, 'rb') as f:
+        return json.loads(f.read())
 
 
 def extract_aircraft_data(json_data: Dict) -> Optional[Dict[str, any]]:
@@ -85,73 +218,93 @@ def extract_aircraft_data(json_data: Dict) -> Optional[Dict[str, any]]:
         json_data: Dictionary containing aircraft data
         
     Returns:
-        Dictionary with extracted fields, or None if required fields are missing
+        Dictionary with extracted fields, or None if the data isn't a JSON object
     """
-    try:
-        # Define the required fields for our CSV
-        required_fields = {
-            'manufacturer': json_data.get('manufacturer', ''),
-            'model': json_data.get('model', ''),
-            'introduced': json_data.get('introduced', ''),
-            'length_ft': json_data.get('length_ft', ''),
-            'top_speed_mph': json_data.get('top_speed_mph', ''),
-            'number_of_engines': json_data.get('number_of_engines', '')
-        }
-        
-        return required_fields
-        
-    except Exception as e:
-        print(f"✗ Warning: Error extracting data: {e}")
+    # Top-level lists or scalars can't hold aircraft fields
+    if not isinstance(json_data, dict):
         return None
+    
+    # Define the required fields for our CSV
+    required_fields = {
+        'manufacturer': json_data.get('manufacturer', ''),
+        'model': json_data.get('model', ''),
+        'introduced': json_data.get('introduced', ''),
+        'length_ft': json_data.get('length_ft', ''),
+        'top_speed_mph': json_data.get('top_speed_mph', ''),
+        'number_of_engines': json_data.get('number_of_engines', '')
+    }
+    
+    return required_fields
 
 
-def process_aircraft_files(data_dir: str) -> List[Dict[str, any]]:
+def process_aircraft_files(data_dir: str, pattern: str = "*.json", recursive: bool = False,
+                           min_size: int = 0, max_size: Optional[int] = None,
+                           progress_interval: float = 1.0) -> List[Dict[str, any]]:
     """
     Process all JSON files in the data directory.
     
+    Progress is reported as a throttled status line with rate and ETA, and
+    skipped files are summarized at the end rather than printed one by one.
+    
     Args:
         data_dir: Directory containing JSON files
+        pattern: Glob pattern file names must match
+        recursive: Whether to include files in subdirectories
+        min_size: Minimum file size in bytes
+        max_size: Maximum file size in bytes, or None for no limit
+        progress_interval: Minimum number of seconds between progress updates
         
     Returns:
         List of dictionaries containing aircraft data
     """
     aircraft_list = []
     
-    # Get all files in the directory
-    try:
-        files = os.listdir(data_dir)
-    except FileNotFoundError:
+    if not os.path.isdir(data_dir):
         print(f"✗ Error: Directory not found: {data_dir}")
         return aircraft_list
     
-    # Filter for JSON files only
-    json_files = [f for f in files if f.endswith('.json')]
+    # Discover matching files up front so progress can show an ETA;
+    # unreadable subdirectories are reported in the error summary
+    scan_errors = []
+    json_files = list(scan_json_files(data_dir, pattern, recursive, min_size, max_size,
+                                      on_error=lambda path, e: scan_errors.append((path, e))))
+    progress = ProgressReporter(len(json_files), interval=progress_interval)
+    for path, e in scan_errors:
+        progress.error(f"unreadable directory ({e.strerror})", path)
     
     if not json_files:
         print(f"✗ Warning: No JSON files found in {data_dir}")
+        progress.print_error_summary()
         return aircraft_list
     
     print(f"\nProcessing {len(json_files)} JSON files...")
     
     # Process each JSON file
-    for filename in json_files:
-        file_path = os.path.join(data_dir, filename)
-        
+    for file_path in json_files:
         # Load JSON data
-        json_data = load_json_file(file_path)
+        try:
+            json_data = read_json_file(file_path)
+        except ValueError:
+            # Covers json.JSONDecodeError as well as undecodable bytes
+            progress.error("invalid JSON", file_path)
+            progress.advance()
+            continue
+        except OSError as e:
+            progress.error(f"unreadable ({e.strerror})", file_path)
+            progress.advance()
+            continue
         
-        if json_data:
-            # Extract required fields
-            aircraft_data = extract_aircraft_data(json_data)
-            
-            if aircraft_data:
-                aircraft_list.append(aircraft_data)
-                print(f"  ✓ Processed: {filename}")
-            else:
-                print(f"  ✗ Skipped: {filename} (missing required fields)")
+        # Extract required fields; null, {}, lists and scalars all count as missing
+        aircraft_data = extract_aircraft_data(json_data) if json_data else None
+        
+        if aircraft_data:
+            aircraft_list.append(aircraft_data)
         else:
-            print(f"  ✗ Skipped: {filename} (invalid JSON)")
+            progress.error("missing required fields", file_path)
+        
+        progress.advance()
     
+    progress.finish()
     return aircraft_list
 
 
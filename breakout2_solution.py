@@ -12,10 +12,304 @@ Date: Oct 6, 2025
 import requests
 import json
 import os
+import gzip
+import sqlite3
+import difflib
+import unicodedata
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 import sys
+import math
+import time
+
+# NumPy is only needed for the observation history store (extended mode)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# OpenWeather's group endpoint accepts at most 20 city IDs per request
+GROUP_MAX_IDS = 20
+
+
+def normalize_city_name(name: str) -> str:
+    """
+    Normalize a city name for index lookups.
+    
+    Strips accents, lowercases, and collapses punctuation and whitespace so
+    that e.g. "São Paulo" and "sao  paulo" map to the same key.
+    
+    Args:
+        name: City name as typed by the user or listed in the city file
+        
+    Returns:
+        Normalized name
+    """
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    cleaned = ''.join(c if c.isalnum() else ' ' for c in stripped.casefold())
+    return ' '.join(cleaned.split())
+
+
+# Fields stored per observation in the history files (24 bytes per record)
+HISTORY_FIELDS = ['temp', 'pressure', 'humidity', 'wind']
+
+
+class WeatherHistory:
+    """
+    An append-only store of weather observations, one binary file per city.
+    
+    Each file is a flat array of fixed-size records (timestamp plus
+    HISTORY_FIELDS) that is appended to on every fetch and read back as a
+    NumPy memory map, so window aggregates over months of data only touch
+    the records inside the window.
+    
+    Attributes:
+        history_dir: Directory containing the per-city history files
+        dtype: NumPy record layout of a single observation
+    """
+    
+    def __init__(self, history_dir: str):
+        """
+        Initialize the store, creating the history directory if needed.
+        
+        Args:
+            history_dir: Directory to keep the per-city history files in
+            
+        Raises:
+            ImportError: If NumPy isn't installed
+        """
+        if np is None:
+            raise ImportError("NumPy is required for weather history (pip install numpy)")
+        
+        self.history_dir = history_dir
+        self.dtype = np.dtype([('timestamp', '<f8')] + [(field, '<f4') for field in HISTORY_FIELDS])
+        os.makedirs(history_dir, exist_ok=True)
+    
+    def _path(self, city_id: int) -> str:
+        """Return the history file path for a city ID."""
+        return os.path.join(self.history_dir, f"{city_id}.dat")
+    
+    def load(self, city_id: int):
+        """
+        Memory-map all observations recorded for a city.
+        
+        Args:
+            city_id: OpenWeather city ID
+            
+        Returns:
+            Read-only structured array of observations ordered by timestamp,
+            or None if nothing has been recorded yet
+        """
+        path = self._path(city_id)
+        if not os.path.exists(path):
+            return None
+        
+        # Ignore a trailing partial record left by an interrupted write
+        count = os.path.getsize(path) // self.dtype.itemsize
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=self.dtype, mode='r', shape=(count,))
+    
+    def append(self, weather_data: Dict) -> bool:
+        """
+        Record the observation contained in an API response.
+        
+        Observations that are not newer than the last recorded one (e.g. the
+        same cached reading fetched twice) are skipped. A trailing partial
+        record left by an interrupted write is discarded first so new
+        records stay aligned.
+        
+        Args:
+            weather_data: Dictionary containing weather data from API
+            
+        Returns:
+            True if a record was appended, False otherwise
+        """
+        timestamp = float(weather_data.get('dt', time.time()))
+        
+        record = np.zeros(1, dtype=self.dtype)
+        record['timestamp'] = timestamp
+        record['temp'] = weather_data['main']['temp']
+        record['pressure'] = weather_data['main']['pressure']
+        record['humidity'] = weather_data['main']['humidity']
+        record['wind'] = weather_data.get('wind', {}).get('speed', np.nan)
+        
+        itemsize = self.dtype.itemsize
+        with open(self._path(weather_data['id']), 'a+b') as f:
+            count = f.seek(0, os.SEEK_END) // itemsize
+            if count > 0:
+                f.seek((count - 1) * itemsize)
+                last = np.frombuffer(f.read(itemsize), dtype=self.dtype)[0]
+                if timestamp <= last['timestamp']:
+                    return False
+            
+            # Writes in 'a' mode always go to the end, so cut any partial record first
+            f.truncate(count * itemsize)
+            f.write(record.tobytes())
+        return True
+    
+    def aggregate(self, city_id: int, hours: float) -> Optional[Dict[str, Dict[str, float]]]:
+        """
+        Compute min/max/mean/trend for each field over the last N hours.
+        
+        Args:
+            city_id: OpenWeather city ID
+            hours: Size of the window, ending now
+            
+        Returns:
+            Mapping of field name to its statistics ('min', 'max', 'mean' and
+            'trend' in units per hour), plus 'count' under the 'window' key,
+            or None if no observations fall inside the window
+        """
+        records = self.load(city_id)
+        if records is None:
+            return None
+        
+        # Records are appended in time order, so the window is a tail slice
+        start = np.searchsorted(records['timestamp'], time.time() - hours * 3600)
+        window = records[start:]
+        if len(window) == 0:
+            return None
+        
+        elapsed_hours = (window['timestamp'] - window['timestamp'][0]) / 3600
+        stats: Dict[str, Dict[str, float]] = {'window': {'count': len(window)}}
+        for field in HISTORY_FIELDS:
+            values = window[field].astype('f8')
+            valid = ~np.isnan(values)
+            if not valid.any():
+                continue
+            x, y = elapsed_hours[valid], values[valid]
+            trend = np.polyfit(x, y, 1)[0] if len(y) > 1 and np.ptp(x) > 0 else 0.0
+            stats[field] = {
+                'min': float(y.min()),
+                'max': float(y.max()),
+                'mean': float(y.mean()),
+                'trend': float(trend),
+            }
+        return stats
+
+
+class CityIndex:
+    """
+    A local name-to-ID index built from OpenWeather's offline city list.
+    
+    The city list (city.list.json or city.list.json.gz from
+    https://bulk.openweathermap.org/sample/) is loaded once into an SQLite
+    database so lookups never need to hold the whole file in memory.
+    
+    Attributes:
+        db_path: Path to the SQLite database backing the index
+        connection: Open SQLite connection
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the index database.
+        
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS cities ("
+            "id INTEGER PRIMARY KEY, name TEXT NOT NULL, "
+            "norm_name TEXT NOT NULL, country TEXT NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cities_norm ON cities (norm_name, country)"
+        )
+    
+    def __len__(self) -> int:
+        """Return the number of cities in the index."""
+        return self.connection.execute("SELECT COUNT(*) FROM cities").fetchone()[0]
+    
+    def build(self, city_list_path: str) -> int:
+        """
+        (Re)build the index from an OpenWeather city list file.
+        
+        Args:
+            city_list_path: Path to city.list.json or city.list.json.gz
+            
+        Returns:
+            Number of cities indexed
+        """
+        opener = gzip.open if city_list_path.endswith('.gz') else open
+        with opener(city_list_path, 'rt', encoding='utf-8') as f:
+            cities = json.load(f)
+        
+        rows = (
+            (city['id'], city['name'], normalize_city_name(city['name']),
+             city.get('country', '').upper())
+            for city in cities
+        )
+        with self.connection:
+            self.connection.execute("DELETE FROM cities")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO cities VALUES (?, ?, ?, ?)", rows
+            )
+        return len(self)
+    
+    def candidates(self, query: str) -> List[int]:
+        """
+        Find all city IDs matching a city name.
+        
+        Accepts an optional country code after a comma ("London, GB").
+        Exact normalized matches are tried first, then a fuzzy match among
+        cities sharing the same first letter.
+        
+        Args:
+            query: City name, optionally followed by ", <country code>"
+            
+        Returns:
+            Matching city IDs (empty if no reasonable match exists)
+        """
+        name, _, country = query.partition(',')
+        norm_name = normalize_city_name(name)
+        country = country.strip().upper()
+        if not norm_name:
+            return []
+        
+        sql = "SELECT id FROM cities WHERE norm_name = ?"
+        params: Tuple = (norm_name,)
+        if country:
+            sql += " AND country = ?"
+            params += (country,)
+        ids = [r[0] for r in self.connection.execute(sql, params)]
+        if ids:
+            return ids
+        
+        # Fuzzy fallback, restricted to names sharing the first letter to keep it cheap
+        sql = "SELECT DISTINCT norm_name FROM cities WHERE norm_name >= ? AND norm_name < ?"
+        params = (norm_name[0], chr(ord(norm_name[0]) + 1))
+        if country:
+            sql += " AND country = ?"
+            params += (country,)
+        names = [r[0] for r in self.connection.execute(sql, params)]
+        matches = difflib.get_close_matches(norm_name, names, n=1, cutoff=0.85)
+        if not matches:
+            return []
+        return self.candidates(f"{matches[0]}, {country}" if country else matches[0])
+    
+    def lookup(self, query: str) -> Optional[int]:
+        """
+        Resolve a city name to its OpenWeather city ID.
+        
+        Args:
+            query: City name, optionally followed by ", <country code>"
+            
+        Returns:
+            City ID, or None if the name matches no city or more than one
+        """
+        ids = self.candidates(query)
+        return ids[0] if len(ids) == 1 else None
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.connection.close()
 
 
 class WeatherApp:
@@ -25,20 +319,29 @@ class WeatherApp:
     Attributes:
         api_key: OpenWeather API key
         base_url: Base URL for OpenWeather API
+        group_url: URL for the multi-city group endpoint
+        city_index: Optional local name-to-ID index used for bulk queries
+        history: Optional store recording every fetched observation
         current_location: Currently set location
         weather_data: Cached weather data for current location
         log_messages: List of messages to be logged
     """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, city_index: Optional[CityIndex] = None,
+                 history: Optional[WeatherHistory] = None):
         """
         Initialize the WeatherApp with an API key.
         
         Args:
             api_key: Valid OpenWeather API key
+            city_index: Optional city index enabling bulk group requests
+            history: Optional observation history store
         """
         self.api_key = api_key
         self.base_url = "https://api.openweathermap.org/data/2.5/weather"
+        self.group_url = "https://api.openweathermap.org/data/2.5/group"
+        self.city_index = city_index
+        self.history = history
         self.current_location = None
         self.weather_data = None
         self.log_messages: List[str] = []
@@ -54,6 +357,21 @@ class WeatherApp:
         log_entry = f"[{timestamp}] {message}"
         self.log_messages.append(log_entry)
         
+    def record_history(self, weather_data: Dict) -> None:
+        """
+        Append an observation to the history store, if one is configured.
+        
+        Args:
+            weather_data: Dictionary containing weather data from API
+        """
+        if not self.history:
+            return
+        
+        try:
+            self.history.append(weather_data)
+        except (KeyError, TypeError, ValueError, OSError) as e:
+            self.log(f"Could not record weather history: {e}")
+    
     def fetch_weather(self, city: str) -> Optional[Dict]:
         """
         Fetch weather data from OpenWeather API for a given city.
@@ -80,6 +398,7 @@ class WeatherApp:
             if response.status_code == 200:
                 data = response.json()
                 self.log(f"Successfully retrieved weather data for {city}")
+                self.record_history(data)
                 return data
             elif response.status_code == 401:
                 error_msg = "Error: Invalid API key. Please check your API key."
@@ -113,6 +432,97 @@ class WeatherApp:
             self.log(error_msg)
             return None
     
+    def fetch_weather_group(self, city_ids: List[int]) -> List[Dict]:
+        """
+        Fetch weather data for up to GROUP_MAX_IDS cities in a single API call.
+        
+        Args:
+            city_ids: OpenWeather city IDs to query
+            
+        Returns:
+            List of per-city weather dictionaries (empty if the request fails)
+        """
+        try:
+            params = {
+                'id': ','.join(str(city_id) for city_id in city_ids),
+                'appid': self.api_key,
+                'units': 'imperial'
+            }
+            
+            self.log(f"Fetching group weather data for {len(city_ids)} city IDs")
+            response = requests.get(self.group_url, params=params, timeout=10)
+            
+            if response.status_code == 200:
+                entries = response.json().get('list', [])
+                self.log(f"Successfully retrieved group weather data for {len(entries)} cities")
+                for entry in entries:
+                    self.record_history(entry)
+                return entries
+            elif response.status_code == 401:
+                error_msg = "Error: Invalid API key. Please check your API key."
+            else:
+                error_msg = f"Error: Group API request failed with status code {response.status_code}"
+            print(error_msg)
+            self.log(error_msg)
+            return []
+            
+        except requests.exceptions.Timeout:
+            error_msg = "Error: Request timed out. Please check your internet connection."
+        except requests.exceptions.ConnectionError:
+            error_msg = "Error: Could not connect to OpenWeather API. Please check your internet connection."
+        except Exception as e:
+            error_msg = f"Error: An unexpected error occurred: {e}"
+        print(error_msg)
+        self.log(error_msg)
+        return []
+    
+    def fetch_weather_bulk(self, cities: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch weather data for many cities using as few API calls as possible.
+        
+        Names are resolved to city IDs through the local city index and packed
+        into group requests of up to GROUP_MAX_IDS IDs each. Names the index
+        cannot resolve to a single city (or every name, if no index is loaded)
+        fall back to one fetch_weather call per city. Cities in a failed group
+        request are not retried individually.
+        
+        Args:
+            cities: City names to query
+            
+        Returns:
+            Mapping of each requested name, in input order, to its weather data
+            (the same shape fetch_weather returns, usable with
+            display_basic_weather), or None if no data could be retrieved for it
+        """
+        results: Dict[str, Optional[Dict]] = dict.fromkeys(cities)
+        names_by_id: Dict[int, List[str]] = {}
+        unresolved: List[str] = []
+        
+        for city in results:
+            ids = self.city_index.candidates(city) if self.city_index else []
+            if len(ids) == 1:
+                names_by_id.setdefault(ids[0], []).append(city)
+            else:
+                if len(ids) > 1:
+                    print(f"Note: '{city}' matches {len(ids)} cities; "
+                          f"add ', <country code>' to choose one")
+                    self.log(f"Ambiguous city name in bulk query: {city}")
+                unresolved.append(city)
+        
+        # Query resolved IDs in batches and split the results back out per city
+        ids = list(names_by_id)
+        for start in range(0, len(ids), GROUP_MAX_IDS):
+            batch = ids[start:start + GROUP_MAX_IDS]
+            for entry in self.fetch_weather_group(batch):
+                for city in names_by_id.get(entry.get('id'), []):
+                    results[city] = entry
+        
+        # Single-city requests only for names the index couldn't resolve
+        for city in unresolved:
+            results[city] = self.fetch_weather(city)
+        
+        return results
+    
     def display_basic_weather(self, weather_data: Dict) -> None:
         """
         Display basic weather information (temperature and condition).
@@ -239,6 +649,9 @@ class WeatherApp:
                 humidity = self.weather_data['main']['humidity']
                 print(f"Humidity: {humidity}%")
                 
+            elif detail.split()[0] == 'history':
+                self.display_history(detail.split()[1:])
+                
             elif detail in ['visibility']:
                 visibility = self.weather_data.get('visibility', 'N/A')
                 if visibility != 'N/A':
@@ -249,7 +662,7 @@ class WeatherApp:
                     
             else:
                 print(f"Unknown detail: '{detail}'")
-                print("Available details: time, temperature, feelslike, pressure, sealevel, windspeed, winddirection, windgust, humidity, visibility")
+                print("Available details: time, temperature, feelslike, pressure, sealevel, windspeed, winddirection, windgust, humidity, visibility, history")
             
             self.log(f"Retrieved detail: {detail}")
             
@@ -257,6 +670,41 @@ class WeatherApp:
             print(f"Error: Data not available for '{detail}'")
             self.log(f"Error retrieving detail {detail}: {e}")
     
+    def display_history(self, args: List[str]) -> None:
+        """
+        Display min/max/mean/trend of recorded observations for the current location.
+        
+        Args:
+            args: Optional window size in hours (defaults to 24)
+        """
+        if not self.history:
+            print("History not available. Install NumPy to record weather history.")
+            return
+        
+        try:
+            hours = float(args[0]) if args else 24.0
+        except ValueError:
+            hours = math.nan
+        if not (math.isfinite(hours) and hours > 0):
+            print(f"Error: Invalid number of hours: '{args[0]}'. Usage: get history [hours]")
+            return
+        
+        stats = self.history.aggregate(self.weather_data['id'], hours)
+        if not stats:
+            print(f"No observations recorded in the last {hours:g} hours")
+            return
+        
+        units = {'temp': '°F', 'pressure': 'hPa', 'humidity': '%', 'wind': 'mph'}
+        output = f"\nLast {hours:g} hours in {self.weather_data['name']} "
+        output += f"({stats['window']['count']} observations)\n"
+        output += f"{'Field':<10}{'Min':>10}{'Max':>10}{'Mean':>10}{'Trend/h':>10}\n"
+        for field in HISTORY_FIELDS:
+            if field in stats:
+                field_stats = stats[field]
+                output += f"{field:<10}{field_stats['min']:>10.1f}{field_stats['max']:>10.1f}"
+                output += f"{field_stats['mean']:>10.1f}{field_stats['trend']:>+10.2f}  {units[field]}\n"
+        print(output)
+    
     def save_log(self, filename: str = "log.txt") -> None:
         """
         Save the log messages to a text file.
@@ -307,6 +755,11 @@ EXTENDED COMMANDS (Bonus):
                     • windgust      - Wind gust speed
                     • humidity      - Humidity percentage
                     • visibility    - Visibility distance
+                    • history [h]   - Min/max/mean/trend over the last
+                                      h hours of recorded data (default 24)
+  
+  bulk <c1>; <c2>   Query several cities at once (semicolon-separated);
+                    uses grouped API calls when a city index is loaded
   
   log               Save session log to log.txt
   help              Display this help menu
@@ -318,6 +771,8 @@ EXAMPLES:
   Set location:   location London
   Get detail:     get temperature
   Get detail:     get windspeed
+  Bulk query:     bulk London, GB; Paris; Tokyo
+  History:        get history 48
 
 NOTES:
 ------
@@ -407,6 +862,18 @@ NOTES:
                 else:
                     self.get_weather_detail(args)
                     
+            elif command == 'bulk':
+                cities = [city.strip() for city in args.split(';') if city.strip()]
+                if not cities:
+                    print("Error: Please provide city names. Usage: bulk <city1>; <city2>; ...")
+                else:
+                    for city, weather_data in self.fetch_weather_bulk(cities).items():
+                        if weather_data:
+                            self.display_basic_weather(weather_data)
+                        else:
+                            print(f"✗ No weather data returned for '{city}'")
+                            self.log(f"No weather data returned for {city} in bulk query")
+                    
             elif command == 'log':
                 self.save_log()
                 
@@ -456,6 +923,62 @@ def load_api_key(filename: str = "api_key.txt") -> Optional[str]:
         return None
 
 
+def load_city_index(list_filename: str = "city.list.json.gz",
+                    db_filename: str = "city_index.db") -> Optional[CityIndex]:
+    """
+    Load the local city index, building it from the city list if needed.
+    
+    The index is rebuilt whenever the city list file is newer than the
+    database. Bulk queries still work without an index, just one call per city.
+    
+    Args:
+        list_filename: Name of the OpenWeather city list file in the script's directory
+        db_filename: Name of the SQLite index file in the script's directory
+        
+    Returns:
+        CityIndex instance, or None if neither the index nor the city list exists
+    """
+    script_dir = Path(__file__).parent
+    list_path = script_dir / list_filename
+    db_path = script_dir / db_filename
+    
+    if not list_path.exists() and not db_path.exists():
+        return None
+    
+    try:
+        index = CityIndex(str(db_path))
+        if list_path.exists() and (
+            len(index) == 0 or list_path.stat().st_mtime > db_path.stat().st_mtime
+        ):
+            print(f"Building city index from {list_filename}...")
+            count = index.build(str(list_path))
+            print(f"✓ Indexed {count} cities")
+        return index
+        
+    except Exception as e:
+        print(f"Warning: Could not load city index: {e}")
+        return None
+
+
+def load_weather_history(dirname: str = "weather_history") -> Optional[WeatherHistory]:
+    """
+    Open the observation history store in the script's directory.
+    
+    Args:
+        dirname: Name of the directory holding the per-city history files
+        
+    Returns:
+        WeatherHistory instance, or None if NumPy isn't installed
+    """
+    try:
+        return WeatherHistory(str(Path(__file__).parent / dirname))
+    except ImportError:
+        return None
+    except OSError as e:
+        print(f"Warning: Could not open weather history: {e}")
+        return None
+
+
 def main():
     """Main function to run the weather application."""
     # Load API key from file
@@ -465,8 +988,8 @@ def main():
         print("\nCannot proceed without an API key. Exiting.")
         return
     
-    # Create weather app instance
-    app = WeatherApp(api_key)
+    # Create weather app instance (city index and history are optional)
+    app = WeatherApp(api_key, city_index=load_city_index(), history=load_weather_history())
     
     # Ask user which mode to run
     print("\nSelect mode:")